@@ -1,23 +1,19 @@
 import re
 import time
 import pandas as pd
-import uuid
+
+UUID_RE = re.compile(r'^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$')
+NON_ALNUM_RE = re.compile(r'[^a-zA-Z0-9:/ -]')
+NON_DATE_RE = re.compile(r'[^0-9:/ -]')
+TRAILING_JUNK_RE = re.compile(r'[^0-9.]+$')
 
 def clean_common(df):
     """General cleanup for all columns: removes spaces and special characters"""
     for column in df.columns:
-        df[column] = df[column].astype(str).str.strip()  # Remove spaces
-        df[column] = df[column].apply(lambda x: re.sub(r'[^a-zA-Z0-9:/ -]', '', x))  # Remove special characters
+        values = df[column].astype(str).str.strip()  # Remove spaces
+        df[column] = values.str.replace(NON_ALNUM_RE, '', regex=True)  # Remove special characters
     return df
 
-def is_valid_uuid(value):
-    """Check if a value is a valid UUID"""
-    try:
-        uuid.UUID(str(value))
-        return True
-    except ValueError:
-        return False
-
 def clean_shipments(df):
     """Clean and validate shipments data"""
 
@@ -36,17 +32,22 @@ def clean_shipments(df):
 
     # Standardize carrier names & remove leading hyphens
     if "carrier" in df.columns:
-        df["carrier"] = df["carrier"].str.lower().map(carrier_mapping).fillna(df["carrier"])
-        df["carrier"] = df["carrier"].apply(lambda x: re.sub(r'^-+', '', x))  # Remove leading hyphens
+        df["carrier"] = df["carrier"].str.lower().map(carrier_mapping).fillna(df["carrier"]).str.lstrip("-")
 
-    # Preserve datetime format but clean extra characters & last 3 digits if too long
-    for column in ["shipment_date", "delivery_date"]:
-        if column in df.columns:
-            df[column] = df[column].apply(lambda x: re.sub(r'[^0-9:/ -]', '', x))  # Keep valid date characters
-            df[column] = df[column].apply(lambda x: x[:-3] if len(x) > 10 else x)  # Remove last 3 digits if too long
+    # Clean extra characters & last 3 digits if too long, then parse into datetimes
+    date_columns = [column for column in ["shipment_date", "delivery_date"] if column in df.columns]
+    for column in date_columns:
+        dates = df[column].str.replace(NON_DATE_RE, '', regex=True)  # Keep valid date characters
+        dates = dates.str.slice(0, -3).where(dates.str.len() > 10, dates)  # Remove last 3 digits if too long
+        df[column] = pd.to_datetime(dates, errors="coerce", format="mixed")  # Unparseable dates become NaT
+
+    # Drop shipments without any valid date
+    if date_columns:
+        df = df[df[date_columns].notna().any(axis=1)]
 
     # Validate UUIDs
-    df = df[df["id"].apply(is_valid_uuid) & df["order_id"].apply(is_valid_uuid)]
+    mask = df["id"].str.match(UUID_RE) & df["order_id"].str.match(UUID_RE)
+    df = df[mask.fillna(False)]
 
     # Remove duplicate IDs safely
     df = df.drop_duplicates(subset="id")
@@ -64,21 +65,27 @@ def clean_refunds(df, orders_df, products_df):
 
     df = clean_common(df)  # Apply basic cleaning first
 
-    # Validate UUIDs
-    df = df[df["id"].apply(is_valid_uuid) & df["order_id"].apply(is_valid_uuid) & df["product_id"].apply(is_valid_uuid)]
-
-    # Ensure order_id exists in orders.csv
-    df = df[df["order_id"].isin(orders_df["id"])]
-
-    # Ensure product_id exists in products.csv
-    df = df[df["product_id"].isin(products_df["id"])]
-
-    # Ensure reason is non-empty
-    df = df[df["reason"].str.strip() != ""]
-
-    # **Only check if refund_amount is positive—don't modify values**
-    df["refund_amount"] = df["refund_amount"].astype(str).apply(lambda x: re.sub(r'[^0-9.]$', '', x))  # Remove unwanted trailing characters
-    df = df[df["refund_amount"].str.replace(",", "").astype(float) > 0]  # Keep valid positive refund amounts
+    # Parse refund_amount once; unparseable values become NaN and are dropped with the non-positive ones
+    amount = (df["refund_amount"].astype(str)
+              .str.replace(TRAILING_JUNK_RE, '', regex=True)  # Remove unwanted trailing characters
+              .str.replace(",", "", regex=False))
+    df["refund_amount"] = pd.to_numeric(amount, errors="coerce")
+
+    # Reference ids as plain arrays for the membership checks
+    order_ids = orders_df["id"].to_numpy()
+    product_ids = products_df["id"].to_numpy()
+
+    # Combine all checks into one mask so the frame is sliced only once
+    mask = (
+        df["id"].str.match(UUID_RE)  # Validate UUIDs
+        & df["order_id"].str.match(UUID_RE)
+        & df["product_id"].str.match(UUID_RE)
+        & df["order_id"].isin(order_ids)  # Ensure order_id exists in orders.csv
+        & df["product_id"].isin(product_ids)  # Ensure product_id exists in products.csv
+        & (df["reason"].str.strip() != "")  # Ensure reason is non-empty
+        & (df["refund_amount"] > 0)  # Keep valid positive refund amounts
+    )
+    df = df.loc[mask.fillna(False)]
 
     processing_time = time.time() - start_time
     print(f"Refunds data cleaned in {processing_time:.2f} seconds")
@@ -97,7 +104,7 @@ if __name__ == "__main__":
     cleaned_refunds_df = clean_refunds(refunds_df, orders_df, products_df)
 
     # **Divide refund_amount by 100 before saving**
-    cleaned_refunds_df["refund_amount"] = cleaned_refunds_df["refund_amount"].astype(float) / 100
+    cleaned_refunds_df["refund_amount"] = cleaned_refunds_df["refund_amount"] / 100
 
     # Save cleaned data
     cleaned_shipments_df.to_csv("cleaned_shipments.csv", index=False)
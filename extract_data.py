@@ -1,12 +1,38 @@
 import json
+import os
+
+import ijson
+import orjson
+
+# Files above this size are streamed instead of being parsed in full
+STREAMING_THRESHOLD_BYTES = 50 * 1024 * 1024
+
+
+def load_business_metrics(file_path, keys):
+    """Load the requested entries under business_metrics from a response file"""
+    if os.path.getsize(file_path) <= STREAMING_THRESHOLD_BYTES:
+        with open(file_path, 'rb') as file:
+            business_metrics = orjson.loads(file.read()).get('business_metrics', {})
+        return {key: business_metrics[key] for key in keys if key in business_metrics}
+
+    # Stream only the business_metrics object so large sections like valid_names are never materialized
+    with open(file_path, 'rb') as file:
+        return {
+            key: value
+            for key, value in ijson.kvitems(file, 'business_metrics', use_float=True)
+            if key in keys
+        }
+
 
 # Load the data from response.json
-with open('response.json', 'r') as file:
-    data = json.load(file)
+business_metrics = load_business_metrics(
+    'response.json',
+    ['shipping_performance_by_carrier', 'top_5_customers_by_total_spend']
+)
 
 # Check if shipping_performance_by_carrier exists and print its structure
-if 'business_metrics' in data and 'shipping_performance_by_carrier' in data['business_metrics']:
-    shipping_data = data['business_metrics']['shipping_performance_by_carrier']
+if 'shipping_performance_by_carrier' in business_metrics:
+    shipping_data = business_metrics['shipping_performance_by_carrier']
     print("\nShipping Performance Data Structure:")
     print(f"Number of carriers: {len(shipping_data)}")
     
@@ -20,8 +46,8 @@ else:
     print("Could not find shipping_performance_by_carrier in the JSON data")
 
 # Extract the top 5 customers data
-if 'business_metrics' in data and 'top_5_customers_by_total_spend' in data['business_metrics']:
-    top_customers = data['business_metrics']['top_5_customers_by_total_spend']
+if 'top_5_customers_by_total_spend' in business_metrics:
+    top_customers = business_metrics['top_5_customers_by_total_spend']
     print("Top 5 Customers by Total Spend:")
     # Print the structure
     print("Structure of the first customer entry:")
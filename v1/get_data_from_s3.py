@@ -1,5 +1,8 @@
 import boto3
 import os
+from concurrent.futures import ThreadPoolExecutor
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError, ClientError
 from dotenv import load_dotenv
 
@@ -11,6 +14,16 @@ ACCESS_KEY = os.getenv('AWS_ACCESS_KEY')
 SECRET_KEY = os.getenv('AWS_SECRET_KEY')
 BUCKET_NAME = os.getenv('AWS_BUCKET_NAME')
 
+# Downloads are network-bound, so several files are fetched at once. Each multipart
+# transfer is capped at a few threads so the total connection count stays bounded.
+MAX_DOWNLOAD_WORKERS = 16
+MULTIPART_CONCURRENCY = 4
+TRANSFER_CONFIG = TransferConfig(max_concurrency=MULTIPART_CONCURRENCY)
+
+# All downloads share one client, so its connection pool must hold a connection for every
+# transfer thread; botocore's default of 10 would discard the extra connections
+CLIENT_CONFIG = Config(max_pool_connections=MAX_DOWNLOAD_WORKERS * MULTIPART_CONCURRENCY)
+
 def list_and_download_files(bucket_name, download_dir='downloads'):
     try:
         # Create download directory if it doesn't exist
@@ -18,7 +31,12 @@ def list_and_download_files(bucket_name, download_dir='downloads'):
             os.makedirs(download_dir)
 
         # Create a session using the provided credentials
-        s3 = boto3.client('s3', aws_access_key_id=ACCESS_KEY, aws_secret_access_key=SECRET_KEY)
+        s3 = boto3.client(
+            's3',
+            aws_access_key_id=ACCESS_KEY,
+            aws_secret_access_key=SECRET_KEY,
+            config=CLIENT_CONFIG
+        )
 
         # List objects in the bucket
         response = s3.list_objects_v2(Bucket=bucket_name)
@@ -29,12 +47,17 @@ def list_and_download_files(bucket_name, download_dir='downloads'):
                 file_key = obj['Key']
                 file_size = obj['Size']
                 print(f"- {file_key} (Size: {file_size} bytes)")
-                
-                # Download each file
+
+            def download_file(file_key):
                 local_file_path = os.path.join(download_dir, file_key)
                 print(f"Downloading {file_key}...")
-                s3.download_file(bucket_name, file_key, local_file_path)
+                s3.download_file(bucket_name, file_key, local_file_path, Config=TRANSFER_CONFIG)
                 print(f"Downloaded to {local_file_path}")
+
+            # Download all files concurrently; worker errors are re-raised here
+            file_keys = [obj['Key'] for obj in response['Contents']]
+            with ThreadPoolExecutor(max_workers=min(MAX_DOWNLOAD_WORKERS, len(file_keys))) as executor:
+                list(executor.map(download_file, file_keys))
         else:
             print(f"No files found in bucket {bucket_name}")
 
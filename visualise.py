@@ -1,109 +1,109 @@
 import dash
 from dash import dcc, html
 from dash.dependencies import Input, Output
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from scipy import stats
 import json
-from plotly.subplots import make_subplots
+from functools import lru_cache
+
+# orjson is optional; fall back to the stdlib parser when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dashboard sections of business_metrics:
+# (key, description, columns to keep, column renames, label column stored as category)
+METRIC_SPECS = [
+    ('top_5_customers_by_total_spend', 'top customers',
+     ['name', 'total_spent'], {'name': 'customers', 'total_spent': 'total_spend'}, 'customers'),
+    ('top_5_products_by_revenue', 'top products',
+     ['name', 'total_revenue'], {'name': 'products', 'total_revenue': 'revenue'}, 'products'),
+    ('shipping_performance_by_carrier', 'shipping performance',
+     ['carrier', 'total_shipments', 'on_time_deliveries', 'delayed_shipments', 'undelivered_shipments'], {}, 'carrier'),
+    ('refund_reason_analysis', 'refund reason analysis',
+     ['reason', 'total_returns', 'total_refund_amount'], {}, 'reason'),
+]
 
 # Load real data from response.json
+metric_dfs = {}
 try:
-    with open('response.json', 'r') as file:
-        json_data = json.load(file)
+    with open('response.json', 'rb') as file:
+        json_data = orjson.loads(file.read()) if orjson is not None else json.load(file)
     
-    # Extract top 5 customers data
-    if 'business_metrics' in json_data and 'top_5_customers_by_total_spend' in json_data['business_metrics']:
-        top_customers_data = json_data['business_metrics']['top_5_customers_by_total_spend']
-        # Create DataFrame for top customers
-        real_top_customers_df = pd.DataFrame([
-            {
-                'customers': customer['name'],
-                'total_spend': customer['total_spent']
-            } for customer in top_customers_data
-        ])
-        print("Successfully loaded top customers data from response.json")
-    else:
-        real_top_customers_df = None
-        print("Could not find top_5_customers_by_total_spend in response.json")
-        
-    # Extract top 5 products data
-    if 'business_metrics' in json_data and 'top_5_products_by_revenue' in json_data['business_metrics']:
-        top_products_data = json_data['business_metrics']['top_5_products_by_revenue']
-        # Create DataFrame for top products
-        real_top_products_df = pd.DataFrame([
-            {
-                'products': product['name'],
-                'revenue': product['total_revenue']
-            } for product in top_products_data
-        ])
-        print("Successfully loaded top products data from response.json")
-    else:
-        real_top_products_df = None
-        print("Could not find top_5_products_by_revenue in response.json")
-        
-    # Extract shipping performance by carrier data
-    if 'business_metrics' in json_data and 'shipping_performance_by_carrier' in json_data['business_metrics']:
-        shipping_performance_data = json_data['business_metrics']['shipping_performance_by_carrier']
-        # Create DataFrame for shipping performance with calculated metrics
-        real_shipping_performance_df = pd.DataFrame([
-            {
-                'carrier': carrier['carrier'],
-                'total_shipments': carrier['total_shipments'],
-                'on_time_deliveries': carrier['on_time_deliveries'],
-                'delayed_shipments': carrier['delayed_shipments'],
-                'undelivered_shipments': carrier['undelivered_shipments']
-            } for carrier in shipping_performance_data
-        ])
-        
-        # Calculate derived metrics
-        real_shipping_performance_df['on_time_delivery_rate'] = real_shipping_performance_df['on_time_deliveries'] / real_shipping_performance_df['total_shipments']
-        real_shipping_performance_df['lost_packages_rate'] = real_shipping_performance_df['undelivered_shipments'] / real_shipping_performance_df['total_shipments']
-        # We don't have average delivery time in the data, so we'll create a placeholder
-        real_shipping_performance_df['average_delivery_time'] = np.random.uniform(1, 5, len(real_shipping_performance_df))
-        
-        print("Successfully loaded shipping performance data from response.json")
-    else:
-        real_shipping_performance_df = None
-        print("Could not find shipping_performance_by_carrier in response.json")
-        
-    # Extract refund reason analysis data
-    if 'business_metrics' in json_data and 'refund_reason_analysis' in json_data['business_metrics']:
-        refund_reason_data = json_data['business_metrics']['refund_reason_analysis']
-        # Create DataFrame for refund reasons
-        real_refund_reason_df = pd.DataFrame([
-            {
-                'reason': reason['reason'],
-                'total_returns': reason['total_returns'],
-                'total_refund_amount': reason['total_refund_amount']
-            } for reason in refund_reason_data
-        ])
-        print("Successfully loaded refund reason analysis data from response.json")
-    else:
-        real_refund_reason_df = None
-        print("Could not find refund_reason_analysis in response.json")
+    # Keep only the metric sections so the rest of the tree (e.g. valid_names)
+    # is released before any DataFrames are built
+    business_metrics = json_data.get('business_metrics', {})
+    del json_data
+    
+    # Create one DataFrame per section; shipping rates are derived when the chart is built
+    for key, description, columns, rename, label in METRIC_SPECS:
+        if key in business_metrics:
+            df = pd.json_normalize(business_metrics[key])[columns].rename(columns=rename)
+            df[label] = df[label].astype('category')
+            metric_dfs[key] = df
+            print(f"Successfully loaded {description} data from response.json")
+        else:
+            print(f"Could not find {key} in response.json")
+    
+    # The data never changes, so sort it once for display rather than on every chart build
+    if 'shipping_performance_by_carrier' in metric_dfs:
+        metric_dfs['shipping_performance_by_carrier'] = metric_dfs['shipping_performance_by_carrier'].sort_values(
+            'total_shipments', ascending=False
+        ).reset_index(drop=True)
+    if 'refund_reason_analysis' in metric_dfs:
+        metric_dfs['refund_reason_analysis'] = metric_dfs['refund_reason_analysis'].sort_values(
+            'total_returns'
+        ).reset_index(drop=True)
 except Exception as e:
     print(f"Error loading response.json: {e}")
-    real_top_customers_df = None
-    real_top_products_df = None
-    real_shipping_performance_df = None
-    real_refund_reason_df = None
+    metric_dfs = {}
 
-# Sample data for time series visualizations
-data = {
-    'date': pd.date_range(start='2023-01-01', periods=100, freq='D'),
-    'spend': np.random.rand(100) * 1000,
-    'shipping_performance': np.random.rand(100) * 100,
-    'refunds': np.random.rand(100) * 50,
-}
-df = pd.DataFrame(data)
+real_top_customers_df = metric_dfs.get('top_5_customers_by_total_spend')
+real_top_products_df = metric_dfs.get('top_5_products_by_revenue')
+real_shipping_performance_df = metric_dfs.get('shipping_performance_by_carrier')
+real_refund_reason_df = metric_dfs.get('refund_reason_analysis')
+
+# Compiled z-score kernel, built on first use so the dashboard never imports numba at
+# startup. numba is optional; without it anomaly detection uses the scipy z-score.
+@lru_cache(maxsize=1)
+def _get_zscore_kernel():
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+    
+    # Mean, std and threshold in plain loops with no temporary arrays.
+    # error_model='numpy' makes a zero std give NaN (never an anomaly) like scipy instead of raising.
+    @njit(cache=True, error_model='numpy')
+    def _zscore_anomalies(values, threshold):
+        n = values.size
+        total = 0.0
+        for i in range(n):
+            total += values[i]
+        mean = total / n
+        squares = 0.0
+        for i in range(n):
+            diff = values[i] - mean
+            squares += diff * diff
+        std = (squares / n) ** 0.5
+        result = np.empty(n, np.bool_)
+        for i in range(n):
+            result[i] = abs((values[i] - mean) / std) > threshold
+        return result
+    
+    return _zscore_anomalies
 
 # Function to detect anomalies using z-score
 def detect_anomalies(series, threshold=2.5):
     """Detect anomalies in a time series using z-score."""
-    z_scores = np.abs(stats.zscore(series))
+    values = np.ascontiguousarray(series, dtype=np.float64)
+    kernel = _get_zscore_kernel()
+    if kernel is not None:
+        return kernel(values, threshold)
+    z_scores = np.abs(stats.zscore(values))
     return z_scores > threshold
 
 # Initialize the Dash app
@@ -133,9 +133,17 @@ app.layout = html.Div([
      Output('top-products-chart', 'figure'),
      Output('shipping-carriers-chart', 'figure'),
      Output('refund-reasons-chart', 'figure')],
-    [Input('trigger-container', 'children')]  # Use the hidden div as input trigger
+    [Input('trigger-container', 'children')],  # Use the hidden div as input trigger
+    prevent_initial_call=False
 )
 def update_charts(_):
+    # Every page load fires this as its initial call and needs the figures. The data is
+    # loaded once at import, so a later re-fire of the trigger cannot change anything
+    # and is answered without re-sending the figures.
+    if dash.callback_context.triggered_id is not None:
+        return (dash.no_update,) * 4
+    
+    # Each builder is cached and runs only once
     # Create top 5 customers chart
     top_customers_fig = create_top_customers_chart()
     
@@ -151,25 +159,23 @@ def update_charts(_):
     return top_customers_fig, top_products_fig, shipping_carriers_fig, refund_reasons_fig
 
 # Function to create shipping performance by carrier chart
+@lru_cache(maxsize=1)
 def create_shipping_carriers_chart():
     """Create a horizontal bar chart showing shipping performance by carrier."""
     # Use real data from response.json
     if real_shipping_performance_df is not None:
-        shipping_data = real_shipping_performance_df
+        # Calculate derived metrics in a single copy of the data
+        shipping_data = real_shipping_performance_df.assign(
+            on_time_delivery_rate=real_shipping_performance_df['on_time_deliveries'] / real_shipping_performance_df['total_shipments'],
+            lost_packages_rate=real_shipping_performance_df['undelivered_shipments'] / real_shipping_performance_df['total_shipments']
+        )
     else:
         # Create empty DataFrame if no data available
-        shipping_data = pd.DataFrame(columns=['carrier', 'total_shipments', 'on_time_delivery_rate', 'average_delivery_time', 'lost_packages_rate'])
+        shipping_data = pd.DataFrame(columns=['carrier', 'total_shipments', 'on_time_delivery_rate', 'lost_packages_rate'])
         print("Warning: No shipping performance data available")
     
-    # Sort data by total shipments for better visualization
-    shipping_data = shipping_data.sort_values('total_shipments', ascending=False)
-    
-    # Create figure with subplot to have better control over layout
-    fig = make_subplots(
-        rows=1, cols=1,
-        specs=[[{"secondary_y": True}]],
-        subplot_titles=["Shipping Performance by Carrier"]
-    )
+    # Create figure; the percentage traces are drawn against a secondary y-axis
+    fig = go.Figure()
     
     # Add total shipments bars
     fig.add_trace(
@@ -179,11 +185,10 @@ def create_shipping_carriers_chart():
             name='Total Shipments',
             orientation='h',
             marker=dict(color='#3498DB'),
-            text=shipping_data['total_shipments'].apply(lambda x: f"{x:,}"),
+            text=[f"{x:,}" for x in shipping_data['total_shipments'].to_numpy()],
             textposition='auto',
             hovertemplate='<b>%{y}</b><br>Total Shipments: %{text}<extra></extra>'
-        ),
-        row=1, col=1, secondary_y=False
+        )
     )
     
     # Calculate percentage metrics for easier understanding
@@ -198,12 +203,12 @@ def create_shipping_carriers_chart():
             name='On-Time Delivery %',
             orientation='h',
             marker=dict(color='#27AE60'),
-            text=on_time_pct.apply(lambda x: f"{x:.1f}%"),
+            text=[f"{x:.1f}%" for x in on_time_pct.to_numpy()],
             textposition='auto',
             width=0.5,  # Make bars thinner
-            hovertemplate='<b>%{y}</b><br>On-Time Rate: %{text}<extra></extra>'
-        ),
-        row=1, col=1, secondary_y=True
+            hovertemplate='<b>%{y}</b><br>On-Time Rate: %{text}<extra></extra>',
+            yaxis='y2'
+        )
     )
     
     # Add lost packages percentage (red markers)
@@ -219,14 +224,19 @@ def create_shipping_carriers_chart():
                 symbol='diamond',
                 line=dict(width=1, color='#7F0000')
             ),
-            text=lost_pct.apply(lambda x: f"{x:.1f}%"),
+            text=[f"{x:.1f}%" for x in lost_pct.to_numpy()],
             textposition='middle right',
-            hovertemplate='<b>%{y}</b><br>Lost Package Rate: %{text}<extra></extra>'
-        ),
-        row=1, col=1, secondary_y=True
+            hovertemplate='<b>%{y}</b><br>Lost Package Rate: %{text}<extra></extra>',
+            yaxis='y2'
+        )
     )
     
-    # Update layout for better readability
+    carrier_axis = dict(
+        title=dict(text='Carrier', font=dict(size=14, family="Arial, sans-serif")),
+        automargin=True
+    )
+    
+    # Update layout and axes in one pass for better readability
     fig.update_layout(
         title={
             'text': 'Shipping Performance by Carrier',
@@ -252,6 +262,20 @@ def create_shipping_carriers_chart():
             borderwidth=1
         ),
         hovermode='closest',
+        # Primary x-axis (total shipments)
+        xaxis=dict(
+            title=dict(text='Total Shipments', font=dict(size=14, family="Arial, sans-serif")),
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(0, 0, 0, 0.1)',
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor='rgba(0, 0, 0, 0.2)',
+            domain=[0.0, 0.94]  # Leave room for the secondary y-axis on the right
+        ),
+        # Both y-axes share the carrier labels
+        yaxis=carrier_axis,
+        yaxis2=dict(carrier_axis, anchor='x', overlaying='y', side='right'),
         # Add secondary x-axis title using annotations
         annotations=[
             dict(
@@ -278,30 +302,10 @@ def create_shipping_carriers_chart():
         ]
     )
     
-    # Update primary x-axis (total shipments)
-    fig.update_xaxes(
-        title_text='Total Shipments',
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='rgba(0, 0, 0, 0.1)',
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='rgba(0, 0, 0, 0.2)',
-        title_font=dict(size=14, family="Arial, sans-serif"),
-        row=1, col=1
-    )
-    
-    # Update y-axis
-    fig.update_yaxes(
-        title_text='Carrier',
-        automargin=True,
-        title_font=dict(size=14, family="Arial, sans-serif"),
-        row=1, col=1
-    )
-    
     return fig
 
 # Function to create top 5 products chart
+@lru_cache(maxsize=1)
 def create_top_products_chart():
     """Create a bar chart showing the top 5 products by revenue using real data."""
     # Use real data from response.json
@@ -312,27 +316,29 @@ def create_top_products_chart():
         top_products = pd.DataFrame(columns=['products', 'revenue'])
         print("Warning: No product data available")
     
-    # Create horizontal bar chart
-    fig = px.bar(
-        top_products,
-        y='products',
-        x='revenue',
-        orientation='h',
-        title='Top 5 Products by Revenue',
-        labels={'revenue': 'Revenue ($)', 'products': 'Product'},
-        color='revenue',
-        color_continuous_scale='Plasma'  # Different color scale from customers chart
+    # Create horizontal bar chart, colored by value
+    revenue = top_products['revenue'].to_numpy()
+    fig = go.Figure(
+        go.Bar(
+            y=top_products['products'].to_numpy(),
+            x=revenue,
+            orientation='h',
+            marker=dict(color=revenue, colorscale='Plasma'),  # Different color scale from customers chart
+            hovertemplate='Product=%{y}<br>Revenue ($)=%{x}<extra></extra>'
+        )
     )
     
     fig.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        coloraxis_showscale=False,
+        title='Top 5 Products by Revenue',
+        xaxis_title='Revenue ($)',
+        yaxis={'title': 'Product', 'categoryorder': 'total ascending'},
         height=500
     )
     
     return fig
 
 # Function to create top 5 customers chart
+@lru_cache(maxsize=1)
 def create_top_customers_chart():
     """Create a bar chart showing the top 5 customers by total spend using real data."""
     # Use real data from response.json
@@ -343,67 +349,48 @@ def create_top_customers_chart():
         top_customers = pd.DataFrame(columns=['customers', 'total_spend'])
         print("Warning: No customer data available")
     
-    # Create horizontal bar chart
-    fig = px.bar(
-        top_customers,
-        y='customers',
-        x='total_spend',
-        orientation='h',
-        title='Top 5 Customers by Total Spend',
-        labels={'total_spend': 'Total Spend ($)', 'customers': 'Customer'},
-        color='total_spend',
-        color_continuous_scale='Viridis'
+    # Create horizontal bar chart, colored by value
+    total_spend = top_customers['total_spend'].to_numpy()
+    fig = go.Figure(
+        go.Bar(
+            y=top_customers['customers'].to_numpy(),
+            x=total_spend,
+            orientation='h',
+            marker=dict(color=total_spend, colorscale='Viridis'),
+            hovertemplate='Customer=%{y}<br>Total Spend ($)=%{x}<extra></extra>'
+        )
     )
     
     fig.update_layout(
-        yaxis={'categoryorder': 'total ascending'},
-        coloraxis_showscale=False,
+        title='Top 5 Customers by Total Spend',
+        xaxis_title='Total Spend ($)',
+        yaxis={'title': 'Customer', 'categoryorder': 'total ascending'},
         height=500
     )
     
     return fig
 
 # Function to create refund reasons chart
+@lru_cache(maxsize=1)
 def create_refund_reasons_chart():
     """Create a horizontal bar chart showing refund reasons analysis."""
     # Use real data from response.json
     if real_refund_reason_df is not None:
         refund_data = real_refund_reason_df
     else:
-        # Create sample DataFrame if no data available
+        # Create sample DataFrame if no data available, already sorted by total returns
         refund_data = pd.DataFrame({
-            'reason': ['Defective', 'Wrong Size', 'Damaged', 'Not as Described', 'Late Delivery'],
-            'total_returns': [120, 85, 65, 45, 30],
-            'total_refund_amount': [4500, 3200, 2800, 1900, 1200]
+            'reason': ['Late Delivery', 'Not as Described', 'Damaged', 'Wrong Size', 'Defective'],
+            'total_returns': [30, 45, 65, 85, 120],
+            'total_refund_amount': [1200, 1900, 2800, 3200, 4500]
         })
         print("Warning: No refund reason data available, using sample data")
     
-    # Sort data by total returns for better visualization
-    refund_data = refund_data.sort_values('total_returns')
-    
-    # Create horizontal bar chart with custom styling
-    fig = go.Figure()
-    
-    # Add bars with customized appearance
-    fig.add_trace(
-        go.Bar(
-            y=refund_data['reason'],
-            x=refund_data['total_refund_amount'],
-            orientation='h',
-            name='Refund Amount',
-            marker=dict(
-                color='rgba(142, 68, 173, 0.8)',
-                line=dict(color='rgba(111, 45, 168, 1.0)', width=1)
-            ),
-            text=refund_data['total_refund_amount'].apply(lambda x: f"${x:,.2f}"),
-            textposition='auto',
-            hovertemplate='<b>%{y}</b><br>Refund Amount: %{text}<br>Returns: %{customdata}<extra></extra>',
-            customdata=refund_data['total_returns']
-        )
-    )
+    # Hand plotly plain arrays and format the bar labels once
+    amounts = refund_data['total_refund_amount'].to_numpy()
     
-    # Update layout for better readability
-    fig.update_layout(
+    # Build the whole layout up front so plotly validates it once on construction
+    layout = go.Layout(
         title={
             'text': 'Refund Reasons Analysis',
             'y': 0.95,
@@ -416,8 +403,22 @@ def create_refund_reasons_chart():
         paper_bgcolor='rgba(250, 250, 250, 0.9)',
         height=500,
         margin=dict(l=100, r=40, t=100, b=40),
-        xaxis_title='Total Refund Amount ($)',
-        yaxis_title='Refund Reason',
+        xaxis=dict(
+            title=dict(text='Total Refund Amount ($)', font=dict(size=14, family="Arial, sans-serif")),
+            showgrid=True,
+            gridwidth=1,
+            gridcolor='rgba(0, 0, 0, 0.1)',
+            zeroline=True,
+            zerolinewidth=2,
+            zerolinecolor='rgba(0, 0, 0, 0.2)',
+            # Adjust tick spacing to 3m instead of default (likely 0.5m)
+            dtick=3000000  # 3 million interval
+        ),
+        yaxis=dict(
+            title=dict(text='Refund Reason', font=dict(size=14, family="Arial, sans-serif")),
+            automargin=True,
+            categoryorder='total ascending'  # Display in ascending order of values
+        ),
         hovermode='closest',
         annotations=[
             dict(
@@ -435,30 +436,32 @@ def create_refund_reasons_chart():
         ]
     )
     
-    # Add axis styling
-    fig.update_xaxes(
-        showgrid=True,
-        gridwidth=1,
-        gridcolor='rgba(0, 0, 0, 0.1)',
-        zeroline=True,
-        zerolinewidth=2,
-        zerolinecolor='rgba(0, 0, 0, 0.2)',
-        title_font=dict(size=14, family="Arial, sans-serif"),
-        # Adjust tick spacing to 3m instead of default (likely 0.5m)
-        dtick=3000000  # 3 million interval
-    )
-    
-    fig.update_yaxes(
-        automargin=True,
-        title_font=dict(size=14, family="Arial, sans-serif"),
-        categoryorder='total ascending'  # Display in ascending order of values
+    # Create horizontal bar chart with custom styling
+    fig = go.Figure(
+        data=go.Bar(
+            y=refund_data['reason'],
+            x=amounts,
+            orientation='h',
+            name='Refund Amount',
+            marker=dict(
+                color='rgba(142, 68, 173, 0.8)',
+                line=dict(color='rgba(111, 45, 168, 1.0)', width=1)
+            ),
+            text=[f"${x:,.2f}" for x in amounts],
+            textposition='auto',
+            hovertemplate='<b>%{y}</b><br>Refund Amount: %{text}<br>Returns: %{customdata}<extra></extra>',
+            customdata=refund_data['total_returns'].to_numpy()
+        ),
+        layout=layout
     )
     
     return fig
 
-# Run the app
+# Run the app with the threaded Flask server for local use. In production serve the
+# Flask instance through a WSGI server instead, e.g.
+#   gunicorn -w 4 -k gthread --threads 4 visualise:app.server
 if __name__ == '__main__':
-    app.run(debug=True)
+    app.run(debug=False, host='0.0.0.0', threaded=True)
 ### Explanation
 
 # - **Dash App**: This code sets up a Dash app with a simple layout containing a date picker and three graphs.